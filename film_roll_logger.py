@@ -3,6 +3,10 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import os
+import json
+import shutil
+import tempfile
+import threading
 from datetime import datetime, date
 
 st.set_page_config(page_title="Film Shoot Planner & Roll Logger", layout="wide")
@@ -31,6 +35,9 @@ st.markdown('''
 ''', unsafe_allow_html=True)
 
 DATA_DIR = "roll_library"
+INDEX_PATH = os.path.join(DATA_DIR, "index.json")
+# Rolls saved from the app are stored as Parquet; imported rolls stay CSV
+ROLL_EXTENSIONS = (".parquet", ".csv")
 os.makedirs(DATA_DIR, exist_ok=True)
 
 # -------------------------
@@ -44,67 +51,212 @@ STANDARD_SHUTTERS = [
 F_STOPS = [1.0, 1.4, 2.0, 2.8, 4.0, 5.6, 8.0, 11.0, 16.0, 22.0, 32.0]
 
 # 1/3-stop ISO list from 25 to 12800
-ISO_CHOICES = [25, 32, 40, 50, 64, 80, 100, 125, 160, 200, 250, 320,
+ISO_CHOICES = (25, 32, 40, 50, 64, 80, 100, 125, 160, 200, 250, 320,
                400, 500, 640, 800, 1000, 1250, 1600, 2000, 2500, 3200,
-               4000, 5000, 6400, 8000, 10000, 12800]
+               4000, 5000, 6400, 8000, 10000, 12800)
 
 def fmt_shutter(t):
     return f"{int(t)}s" if t >= 1 else f"1/{int(round(1/t))}s"
 
-SHUTTER_CHOICES = [fmt_shutter(t) for t in STANDARD_SHUTTERS]
-APERTURE_CHOICES = [f"f/{a:g}" for a in F_STOPS]
+SHUTTER_CHOICES = tuple(fmt_shutter(t) for t in STANDARD_SHUTTERS)
+APERTURE_CHOICES = tuple(f"f/{a:g}" for a in F_STOPS)
+
+# Reverse lookups: choice -> selectbox index
+ISO_INDEX = {v: i for i, v in enumerate(ISO_CHOICES)}
+SHUTTER_INDEX = {v: i for i, v in enumerate(SHUTTER_CHOICES)}
+APERTURE_INDEX = {v: i for i, v in enumerate(APERTURE_CHOICES)}
+LENS_COLUMNS = ["Brand/Name", "Focal Length (mm)", "Max Aperture"]
+ROLL_COLUMNS = ["Frame #", "ISO", "Shutter", "Aperture", "Lens", "Notes"]
+META_COLUMNS = ["Project", "Camera", "Date Shot", "Film", "Film ISO", "ISO Set"]
+
+@st.cache_data(ttl=5, show_spinner=False)
+def list_roll_entries():
+    # One scandir pass gives names and mtimes together; DirEntry caches its stat result.
+    # Lowercased names are built here so the search box doesn't redo it every rerun
+    with os.scandir(DATA_DIR) as it:
+        return sorted((e.name, e.stat().st_mtime, e.name.lower()) for e in it if e.is_file() and e.name.endswith(ROLL_EXTENSIONS))
 
 def list_roll_files():
-    return sorted([f for f in os.listdir(DATA_DIR) if f.endswith(".csv")])
+    return [name for name, _, _ in list_roll_entries()]
 
-def save_roll_csv(df_with_meta, project_name, camera, roll_date, film_type, film_iso, iso_set, frames):
+def filter_roll_files(entries, q, filter_date):
+    ql = q.lower()
+    filtered = [name for name, _, lower in entries if ql in lower]
+    if filter_date:
+        needle = f"__{filter_date}__"
+        filtered = [f for f in filtered if needle in f]
+    return filtered
+
+def read_json(path, default):
+    if not os.path.exists(path):
+        return default
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def write_json_atomic(path, data):
+    # Write to a temp file in the same directory, then rename over the target
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+@st.cache_resource
+def _index_lock():
+    # One lock per server process; sessions run as threads and share index.json
+    return threading.Lock()
+
+def rebuild_roll_index():
+    # The per-roll .meta.json sidecars are the source of truth if index.json is unreadable
+    entries = []
+    for name in sorted(os.listdir(DATA_DIR)):
+        if not name.endswith(".meta.json"):
+            continue
+        try:
+            entries.append(read_json(os.path.join(DATA_DIR, name), None))
+        except json.JSONDecodeError:
+            continue
+    return [m for m in entries if m is not None]
+
+def read_roll_index_entries():
+    try:
+        return read_json(INDEX_PATH, [])
+    except json.JSONDecodeError:
+        return rebuild_roll_index()
+
+def with_roll_meta(df, meta_values):
+    # Prepend the META_COLUMNS in one concat; repeated DataFrame.insert fragments the frame
+    meta_df = pd.DataFrame(dict(zip(META_COLUMNS, meta_values)), index=df.index)
+    return pd.concat([meta_df, df], axis=1)
+
+def save_roll(df_with_meta, project_name, camera, roll_date, film_type, film_iso, iso_set, frames, fmt="parquet"):
     safe_name = project_name.strip().replace(" ", "_")
     camera_name = camera.strip().replace(" ","_")
     film_name = film_type.strip().replace(" ","_")
     date_str = roll_date.strftime("%Y-%m-%d") if hasattr(roll_date, 'strftime') else str(roll_date)
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    fname = f"{timestamp}__{date_str}__{safe_name}__{camera_name}__{film_name}__{frames}f.csv"
+    fname = f"{timestamp}__{date_str}__{safe_name}__{camera_name}__{film_name}__{frames}f.{fmt}"
     path = os.path.join(DATA_DIR, fname)
 
-    export_df = df_with_meta.copy()
-    export_df.insert(0, "Project", project_name)
-    export_df.insert(1, "Camera", camera)
-    export_df.insert(2, "Date Shot", date_str)
-    export_df.insert(3, "Film", film_type)
-    export_df.insert(4, "Film ISO", film_iso)
-    export_df.insert(5, "ISO Set", iso_set)
-    export_df.to_csv(path, index=False)
+    export_df = with_roll_meta(df_with_meta, (project_name, camera, date_str, film_type, film_iso, iso_set))
+    if fmt == "parquet":
+        export_df.to_parquet(path, engine="pyarrow", compression="zstd", index=False)
+    else:
+        export_df.to_csv(path, index=False)
+
+    meta = {
+        "Project": project_name,
+        "Camera": camera,
+        "Date Shot": date_str,
+        "Film": film_type,
+        "Film ISO": film_iso,
+        "ISO Set": iso_set,
+        "frames": frames,
+        "fname": fname,
+    }
+    write_json_atomic(path + ".meta.json", meta)
+    with _index_lock():
+        write_json_atomic(INDEX_PATH, read_roll_index_entries() + [meta])
     return fname
 
-def load_roll_csv(filename):
+@st.cache_data(max_entries=1, show_spinner=False)
+def _read_roll_index(path, mtime):
+    return {m["fname"]: m for m in read_roll_index_entries()}
+
+def load_roll_index():
+    # Maps filename -> roll metadata, so the browser can summarise rolls without reading them
+    if not os.path.exists(INDEX_PATH):
+        return {}
+    return _read_roll_index(INDEX_PATH, os.path.getmtime(INDEX_PATH))
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _read_roll(path, mtime):
+    # mtime is only part of the cache key so an edited file is re-read
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path, engine="pyarrow")
+    return pd.read_csv(path, engine="pyarrow", dtype_backend="pyarrow")
+
+def load_roll(filename, mtime=None):
     path = os.path.join(DATA_DIR, filename)
-    return pd.read_csv(path)
+    if mtime is None:
+        mtime = os.path.getmtime(path)
+    return _read_roll(path, mtime)
+
+@st.cache_data(show_spinner=False)
+def _make_blank_roll(frames, iso, shutter, aperture):
+    # cache_data hands back a fresh copy on every call, so callers can edit the columns in place
+    return {
+        "Frame #": list(range(1, frames + 1)),
+        "ISO": [iso] * frames,
+        "Shutter": [shutter] * frames,
+        "Aperture": [aperture] * frames,
+        "Lens": [""] * frames,
+        "Notes": [""] * frames,
+    }
+
+def roll_cols_from_frame(df):
+    # Normalise a loaded roll to the session representation: plain Python lists, blank text as ""
+    roll_cols = {c: df[c].astype(object).tolist() for c in ROLL_COLUMNS}
+    for c in ("Lens", "Notes"):
+        roll_cols[c] = ["" if pd.isna(v) else v for v in roll_cols[c]]
+    return roll_cols
+
+def roll_frame():
+    # The roll sheet lives in session state as plain lists; only build a DataFrame for display/export
+    return pd.DataFrame(st.session_state.roll_cols, columns=ROLL_COLUMNS, copy=False)
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _csv_bytes(roll_tuple, meta_tuple):
+    # Arguments are hashable snapshots of the roll columns and metadata, so reruns reuse the encoded bytes
+    roll_df = pd.DataFrame(dict(zip(ROLL_COLUMNS, roll_tuple)), columns=ROLL_COLUMNS)
+    return with_roll_meta(roll_df, meta_tuple).to_csv(index=False).encode("utf-8")
+
+def cached_lens_options():
+    # Lenses are per-session, so memoize in session state (st.cache_data would share
+    # entries across sessions) and rebuild only when lenses_version changes
+    version = st.session_state.lenses_version
+    cached = st.session_state.get("lens_options_cache")
+    if cached is None or cached[0] != version:
+        options = ("",) + tuple(l["Brand/Name"] for l in st.session_state.lenses)
+        cached = (version, options, {v: i for i, v in enumerate(options)})
+        st.session_state.lens_options_cache = cached
+    return cached[1], cached[2]
 
 # -------------------------
 # Session init
 # -------------------------
 if "lenses" not in st.session_state:
-    st.session_state.lenses = pd.DataFrame(columns=["Brand/Name", "Focal Length (mm)", "Max Aperture"])
-if "roll_df" not in st.session_state:
-    st.session_state.roll_df = None
+    st.session_state.lenses = []  # list of dicts keyed by LENS_COLUMNS
+if "lenses_version" not in st.session_state:
+    st.session_state.lenses_version = 0  # bump on every lens mutation
+if "roll_cols" not in st.session_state:
+    st.session_state.roll_cols = None  # dict of column -> plain Python list, keyed by ROLL_COLUMNS
 if "reset_pending" not in st.session_state:
     st.session_state.reset_pending = False
 if "mobile_frame_idx" not in st.session_state:
     st.session_state.mobile_frame_idx = 1
+if "imported_uploads" not in st.session_state:
+    st.session_state.imported_uploads = {}  # uploader file_id -> library filename
 
 # -------------------------
 # Project Setup (Sidebar)
 # -------------------------
 with st.sidebar:
     st.header("📁 Project Setup")
-    project_name = st.text_input("Project name", "Untitled Project")
-    camera = st.text_input("Camera", "My Camera")
-    roll_date = st.date_input("Date shot", value=date.today())
-    frames = st.selectbox("Number of frames", [12, 24, 27, 36], index=3)
-    film_type = st.text_input("Film (type/stock)", "Kodak Tri-X 400")
-
-    film_iso = st.selectbox("Film ISO (box speed)", ISO_CHOICES, index=ISO_CHOICES.index(400) if 400 in ISO_CHOICES else 0)
-    iso_set = st.selectbox("ISO set on camera (rating)", ISO_CHOICES, index=ISO_CHOICES.index(400) if 400 in ISO_CHOICES else 0)
+    # A form batches edits into a single rerun on Apply instead of one per keystroke
+    with st.form("project_setup"):
+        project_name = st.text_input("Project name", "Untitled Project")
+        camera = st.text_input("Camera", "My Camera")
+        roll_date = st.date_input("Date shot", value=date.today())
+        frames = st.selectbox("Number of frames", [12, 24, 27, 36], index=3)
+        film_type = st.text_input("Film (type/stock)", "Kodak Tri-X 400")
+
+        film_iso = st.selectbox("Film ISO (box speed)", ISO_CHOICES, index=ISO_INDEX.get(400, 0))
+        iso_set = st.selectbox("ISO set on camera (rating)", ISO_CHOICES, index=ISO_INDEX.get(400, 0))
+        st.form_submit_button("Apply", use_container_width=True)
 
     st.markdown("---")
     mobile_mode = st.toggle("📱 Mobile mode (one-frame editor)", value=False, help="Simplified per-frame editor with larger controls")
@@ -112,27 +264,31 @@ with st.sidebar:
     st.markdown("---")
     st.subheader("📚 Roll Library")
     uploaded = st.file_uploader("Import CSV to library", type=["csv"])
-    if uploaded is not None:
+    # The uploader keeps its file across reruns; only copy it (and clear the shared listing cache) once
+    if uploaded is not None and uploaded.file_id not in st.session_state.imported_uploads:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         dest_name = f"{timestamp}__imported_{uploaded.name}"
         dest_path = os.path.join(DATA_DIR, dest_name)
+        uploaded.seek(0)
         with open(dest_path, "wb") as f:
-            f.write(uploaded.getvalue())
-        st.success(f"Imported as {dest_name}")
+            shutil.copyfileobj(uploaded, f, length=1 << 20)
+        list_roll_entries.clear()
+        st.session_state.imported_uploads[uploaded.file_id] = dest_name
+    if uploaded is not None:
+        st.success(f"Imported as {st.session_state.imported_uploads[uploaded.file_id]}")
     lib_files = list_roll_files()
     if lib_files:
         sel = st.selectbox("Open a saved roll", ["— select —"] + lib_files)
         if sel != "— select —":
-            loaded_df = load_roll_csv(sel)
+            loaded_df = load_roll(sel)
             st.caption(f"Loaded: **{sel}**")
             st.dataframe(loaded_df.head(3), use_container_width=True)
             if st.button("Load into editor", key="load_into_editor"):
-                editor_cols = ["Frame #", "ISO", "Shutter", "Aperture", "Lens", "Notes"]
-                if all(col in loaded_df.columns for col in editor_cols):
-                    st.session_state.roll_df = loaded_df[editor_cols].copy()
+                if all(col in loaded_df.columns for col in ROLL_COLUMNS):
+                    st.session_state.roll_cols = roll_cols_from_frame(loaded_df)
                     st.success("Loaded into editor below.")
                 else:
-                    st.warning("This CSV does not match the expected roll format.")
+                    st.warning("This file does not match the expected roll format.")
 
 # -------------------------
 # Lens Library (optional)
@@ -148,13 +304,11 @@ with st.expander("Add a lens", expanded=False):
         lens_max = st.selectbox("Max Aperture", F_STOPS, index=1, key="lens_max_add")
     with lc4:
         if st.button("➕ Add Lens"):
-            st.session_state.lenses = pd.concat([
-                st.session_state.lenses,
-                pd.DataFrame([{"Brand/Name": lens_name, "Focal Length (mm)": lens_focal, "Max Aperture": lens_max}])
-            ], ignore_index=True)
+            st.session_state.lenses.append({"Brand/Name": lens_name, "Focal Length (mm)": lens_focal, "Max Aperture": lens_max})
+            st.session_state.lenses_version += 1
             st.success("Lens added")
-if not st.session_state.lenses.empty:
-    st.dataframe(st.session_state.lenses, use_container_width=True)
+if st.session_state.lenses:
+    st.dataframe(pd.DataFrame(st.session_state.lenses, columns=LENS_COLUMNS), use_container_width=True)
 
 st.markdown("---")
 
@@ -166,19 +320,12 @@ st.header("🧾 Roll Sheet")
 default_iso = iso_set
 default_shutter = "1/125s"
 default_aperture = "f/8"
-lens_options = [""] + st.session_state.lenses["Brand/Name"].tolist()
+lens_options, lens_index = cached_lens_options()
 
 cbuild, creset, csave, cexport = st.columns([1,1,1,1])
 with cbuild:
     if st.button("🛠️ Build roll sheet"):
-        st.session_state.roll_df = pd.DataFrame({
-            "Frame #": list(range(1, frames + 1)),
-            "ISO": [default_iso] * frames,
-            "Shutter": [default_shutter] * frames,
-            "Aperture": [default_aperture] * frames,
-            "Lens": [""] * frames,
-            "Notes": [""] * frames,
-        })
+        st.session_state.roll_cols = _make_blank_roll(frames, default_iso, default_shutter, default_aperture)
 with creset:
     if st.button("♻️ Reset roll sheet..."):
         st.session_state.reset_pending = True
@@ -189,14 +336,7 @@ if st.session_state.reset_pending:
     cc1, cc2 = st.columns(2)
     with cc1:
         if st.button("✅ Confirm reset now"):
-            st.session_state.roll_df = pd.DataFrame({
-                "Frame #": list(range(1, frames + 1)),
-                "ISO": [default_iso] * frames,
-                "Shutter": [default_shutter] * frames,
-                "Aperture": [default_aperture] * frames,
-                "Lens": [""] * frames,
-                "Notes": [""] * frames,
-            })
+            st.session_state.roll_cols = _make_blank_roll(frames, default_iso, default_shutter, default_aperture)
             st.session_state.reset_pending = False
             st.success("Roll sheet has been reset.")
     with cc2:
@@ -205,33 +345,30 @@ if st.session_state.reset_pending:
             st.info("Reset canceled.")
 
 with csave:
-    if st.session_state.roll_df is not None and st.button("💾 Save to library"):
-        export_df = st.session_state.roll_df.copy()
-        fname = save_roll_csv(export_df, project_name, camera, roll_date, film_type, film_iso, iso_set, frames)
+    if st.session_state.roll_cols is not None and st.button("💾 Save to library"):
+        fname = save_roll(roll_frame(), project_name, camera, roll_date, film_type, film_iso, iso_set, frames)
+        list_roll_entries.clear()
         st.success(f"Saved as {fname} in roll library")
 with cexport:
-    if st.session_state.roll_df is not None and st.button("⬇️ Download CSV"):
-        export_df = st.session_state.roll_df.copy()
-        export_df.insert(0, "Project", project_name)
-        export_df.insert(1, "Camera", camera)
-        export_df.insert(2, "Date Shot", roll_date.strftime("%Y-%m-%d"))
-        export_df.insert(3, "Film", film_type)
-        export_df.insert(4, "Film ISO", film_iso)
-        export_df.insert(5, "ISO Set", iso_set)
-        csv = export_df.to_csv(index=False).encode("utf-8")
-        st.download_button("Save CSV file", data=csv, file_name=f"{project_name.replace(' ', '_').lower()}_roll.csv", mime="text/csv", key="dlbtn")
+    if st.session_state.roll_cols is not None:
+        csv = _csv_bytes(
+            tuple(tuple(st.session_state.roll_cols[c]) for c in ROLL_COLUMNS),
+            (project_name, camera, roll_date.strftime("%Y-%m-%d"), film_type, film_iso, iso_set),
+        )
+        st.download_button("⬇️ Download CSV", data=csv, file_name=f"{project_name.replace(' ', '_').lower()}_roll.csv", mime="text/csv", key="dlbtn")
 
 # -------------------------
 # Editors
 # -------------------------
-if st.session_state.roll_df is None:
+if st.session_state.roll_cols is None:
     st.info("Click **Build roll sheet** to initialize the frame grid.")
 else:
     st.caption(f"Project: **{project_name}** · Camera: **{camera}** · Date: **{roll_date.strftime('%Y-%m-%d')}** · Film: **{film_type}** · Box ISO: **{film_iso}** · ISO Set: **{iso_set}** · Frames: **{frames}**")
 
     if mobile_mode:
         # One-frame editor with next/prev
-        total = len(st.session_state.roll_df)
+        roll_cols = st.session_state.roll_cols
+        total = len(roll_cols["Frame #"])
         cols = st.columns([1,2,1])
         with cols[0]:
             if st.button("⬅️ Prev", use_container_width=True):
@@ -244,26 +381,31 @@ else:
                 st.session_state.mobile_frame_idx = min(total, st.session_state.mobile_frame_idx + 1)
 
         idx = st.session_state.mobile_frame_idx - 1
-        row = st.session_state.roll_df.iloc[idx].copy()
+        row = {c: roll_cols[c][idx] for c in ROLL_COLUMNS}
 
         m1, m2 = st.columns(2)
         with m1:
-            row["ISO"] = st.selectbox("ISO", ISO_CHOICES, index=ISO_CHOICES.index(int(row["ISO"])) if int(row["ISO"]) in ISO_CHOICES else ISO_CHOICES.index(400))
-            row["Shutter"] = st.selectbox("Shutter", SHUTTER_CHOICES, index=SHUTTER_CHOICES.index(row["Shutter"]) if row["Shutter"] in SHUTTER_CHOICES else SHUTTER_CHOICES.index("1/125s"))
+            row["ISO"] = st.selectbox("ISO", ISO_CHOICES, index=ISO_INDEX.get(int(row["ISO"]), ISO_INDEX[400]))
+            row["Shutter"] = st.selectbox("Shutter", SHUTTER_CHOICES, index=SHUTTER_INDEX.get(row["Shutter"], SHUTTER_INDEX["1/125s"]))
         with m2:
-            row["Aperture"] = st.selectbox("Aperture", APERTURE_CHOICES, index=APERTURE_CHOICES.index(row["Aperture"]) if row["Aperture"] in APERTURE_CHOICES else APERTURE_CHOICES.index("f/8"))
-            row["Lens"] = st.selectbox("Lens", [""] + st.session_state.lenses["Brand/Name"].tolist(), index=([""] + st.session_state.lenses["Brand/Name"].tolist()).index(row["Lens"]) if row["Lens"] in ([""] + st.session_state.lenses["Brand/Name"].tolist()) else 0)
+            row["Aperture"] = st.selectbox("Aperture", APERTURE_CHOICES, index=APERTURE_INDEX.get(row["Aperture"], APERTURE_INDEX["f/8"]))
+            row["Lens"] = st.selectbox("Lens", lens_options, index=lens_index.get(row["Lens"], 0))
         notes_val = st.text_area("Notes", value=row["Notes"], height=120)
 
         save_cols = st.columns(2)
         with save_cols[0]:
             if st.button("💾 Save frame", use_container_width=True):
-                st.session_state.roll_df.iloc[idx] = [frame_num, row["ISO"], row["Shutter"], row["Aperture"], row["Lens"], notes_val]
+                roll_cols["ISO"][idx] = row["ISO"]
+                roll_cols["Shutter"][idx] = row["Shutter"]
+                roll_cols["Aperture"][idx] = row["Aperture"]
+                roll_cols["Lens"][idx] = row["Lens"]
+                roll_cols["Notes"][idx] = notes_val
                 st.success(f"Frame {frame_num} updated.")
         with save_cols[1]:
             if st.button("Duplicate last frame", use_container_width=True):
                 if idx > 0:
-                    st.session_state.roll_df.iloc[idx, 1:] = st.session_state.roll_df.iloc[idx-1, 1:]
+                    for c in ROLL_COLUMNS[1:]:
+                        roll_cols[c][idx] = roll_cols[c][idx-1]
                     st.success(f"Frame {frame_num} duplicated from frame {frame_num-1}.")
                 else:
                     st.info("No previous frame to duplicate.")
@@ -275,11 +417,11 @@ else:
             "ISO": st.column_config.SelectboxColumn(options=ISO_CHOICES, width="small"),
             "Shutter": st.column_config.SelectboxColumn(options=SHUTTER_CHOICES, width="small"),
             "Aperture": st.column_config.SelectboxColumn(options=APERTURE_CHOICES, width="small"),
-            "Lens": st.column_config.SelectboxColumn(options=[""] + st.session_state.lenses["Brand/Name"].tolist(), width="medium"),
+            "Lens": st.column_config.SelectboxColumn(options=lens_options, width="medium"),
             "Notes": st.column_config.TextColumn(width="large"),
         }
         st.data_editor(
-            st.session_state.roll_df,
+            roll_frame(),
             column_config=cfg,
             use_container_width=True,
             num_rows="fixed",
@@ -291,33 +433,48 @@ else:
 # -------------------------
 st.markdown("---")
 st.header("📂 Roll Library (Browse Previous Rolls)")
-files = list_roll_files()
-if not files:
-    st.info("No saved rolls yet. Use **Save to library** above to store a roll here.")
-else:
-    f1, f2, f3 = st.columns([2,1,1])
-    with f1:
-        q = st.text_input("Search (filename contains)", "")
-    with f2:
-        sort_new_first = st.checkbox("Newest first", value=True)
-    with f3:
-        filter_date = st.text_input("Filter by date (YYYY-MM-DD, optional)", "")
-
-    filtered = [f for f in files if q.lower() in f.lower()]
-    if filter_date:
-        filtered = [f for f in filtered if f"__{filter_date}__" in f]
+
+@st.fragment
+def library_browser():
+    # Widgets in here rerun only this fragment, not the whole script
+    entries = list_roll_entries()
+    if not entries:
+        st.info("No saved rolls yet. Use **Save to library** above to store a roll here.")
+        return
+
+    with st.form("library_search"):
+        f1, f2, f3 = st.columns([2,1,1])
+        with f1:
+            q = st.text_input("Search (filename contains)", "")
+        with f2:
+            sort_new_first = st.checkbox("Newest first", value=True)
+        with f3:
+            filter_date = st.text_input("Filter by date (YYYY-MM-DD, optional)", "")
+        st.form_submit_button("Search")
+
+    mtimes = {name: mtime for name, mtime, _ in entries}
+    filtered = filter_roll_files(entries, q, filter_date)
     if sort_new_first:
         filtered = sorted(filtered, reverse=True)
 
-    if filtered:
-        st.write(f"Found {len(filtered)} roll(s).")
-        for fname in filtered[:200]:
-            with st.expander(fname, expanded=False):
-                df = load_roll_csv(fname)
-                needed = ["Project","Camera","Date Shot","Film","Film ISO","ISO Set"]
-                if all(k in df.columns for k in needed):
-                    meta = df.iloc[0][needed].to_dict()
+    if not filtered:
+        st.info("No rolls match your search.")
+        return
+
+    st.write(f"Found {len(filtered)} roll(s).")
+    roll_index = load_roll_index()
+    for fname in filtered[:200]:
+        with st.expander(fname, expanded=False):
+            meta = roll_index.get(fname)
+            if meta is not None:
+                st.caption(f"**{meta['Project']}** — {meta['Camera']} — {meta['Film']} — Date {meta['Date Shot']} — ISO {int(meta['Film ISO'])} (set {int(meta['ISO Set'])})")
+            # Expander bodies always execute, so only read the roll once the preview is switched on
+            if st.toggle("Preview", key=f"open_{fname}"):
+                df = load_roll(fname, mtimes[fname])
+                # Imported rolls have no index entry; fall back to the file's own metadata columns
+                if meta is None and all(k in df.columns for k in META_COLUMNS):
+                    meta = df.iloc[0][META_COLUMNS].to_dict()
                     st.caption(f"**{meta['Project']}** — {meta['Camera']} — {meta['Film']} — Date {meta['Date Shot']} — ISO {int(meta['Film ISO'])} (set {int(meta['ISO Set'])})")
                 st.dataframe(df, use_container_width=True)
-    else:
-        st.info("No rolls match your search.")
+
+library_browser()